@@ -1,18 +1,79 @@
 """
 AI Module for AI Smart Campus Assistant
 Includes complaint categorization, sentiment analysis, and resolution time prediction
+
+Set AI_PRELOAD=1 when running under `gunicorn --preload` so the models are
+fully initialized in the master process and shared copy-on-write by workers
+(gunicorn.conf.py does this and freezes the GC before each fork).
 """
+import os
+import nltk
 
-from .categorizer import categorize_complaint, ComplaintCategorizer
-from .sentiment_analyzer import analyze_complaint_sentiment, SentimentAnalyzer
-from .predictor import predict_resolution_time, get_resolution_estimate, ResolutionTimePredictor
+from .categorizer import (
+    categorize_complaint, categorize_batch, train_categorizer_model, ComplaintCategorizer,
+    categorizer
+)
+from .sentiment_analyzer import (
+    analyze_complaint_sentiment, analyze_batch, SentimentAnalyzer, analyzer
+)
+from .predictor import (
+    predict_resolution_time, get_resolution_estimate, ResolutionTimePredictor, predictor
+)
 
 __all__ = [
     'categorize_complaint',
+    'categorize_batch',
+    'train_categorizer_model',
     'analyze_complaint_sentiment',
+    'analyze_batch',
     'predict_resolution_time',
     'get_resolution_estimate',
     'ComplaintCategorizer',
     'SentimentAnalyzer',
-    'ResolutionTimePredictor'
+    'ResolutionTimePredictor',
+    'categorizer',
+    'analyzer',
+    'predictor',
+    'download_nltk_data',
+    'warm_up'
 ]
+
+# NLTK resources used by the models: (path for nltk.data.find, package name)
+NLTK_RESOURCES = (
+    ('corpora/stopwords', 'stopwords'),
+    ('sentiment/vader_lexicon.zip', 'vader_lexicon'),
+)
+
+
+def download_nltk_data():
+    """
+    Download any missing NLTK data
+    
+    The models only ever load NLTK data from disk, so run this (or warm_up)
+    as a setup step; it needs network access and may block.
+    """
+    for resource, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            nltk.download(package, quiet=True)
+
+
+def warm_up():
+    """
+    Run one dummy complaint through every model
+    
+    Downloads missing NLTK data, then triggers lazy initialization (stopwords,
+    VADER lexicon, trained pipeline) up front so it happens once in the master
+    process rather than per worker.
+    """
+    download_nltk_data()
+    sample = 'Urgent: the hostel wifi is not working'
+    categorizer.categorize(sample)
+    categorizer.categorize_batch([sample])
+    analyzer.analyze_complaint(sample)
+    predictor.predict_resolution_time('IT Issues', 'High')
+
+
+if os.environ.get('AI_PRELOAD') == '1':
+    warm_up()
@@ -0,0 +1,101 @@
+"""
+Caching helpers shared by the AI modules
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict
+from cachetools import LRUCache
+
+
+# Seconds to wait before retrying data that failed to load
+RETRY_AFTER = 300
+
+
+def text_digest(text: str) -> bytes:
+    """128-bit BLAKE2b digest of a text, used as a cache key"""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class TextResultCache:
+    """
+    Thread-safe LRU cache of per-text result dictionaries
+    
+    Entries are keyed by a digest of the text, so the cache never holds the
+    full texts.
+    """
+    
+    __slots__ = ('_cache', '_lock')
+    
+    def __init__(self, maxsize: int = 8192):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+    
+    def get(
+        self,
+        text: str,
+        compute: Callable[[str], Dict],
+        cacheable: Callable[[], bool] = None
+    ) -> Dict:
+        """
+        Cached result for a text, computed on a miss
+        
+        Args:
+            text: Text the result belongs to
+            compute: Builds the result from the text
+            cacheable: Checked after a miss; the result is only stored if it returns True
+        
+        Returns:
+            A copy of the result, safe for the caller to modify
+        """
+        key = text_digest(text)
+        with self._lock:
+            result = self._cache.get(key)
+        
+        if result is None:
+            result = compute(text)
+            if cacheable is None or cacheable():
+                with self._lock:
+                    self._cache[key] = result
+        
+        return dict(result)
+
+
+class RetryingLoader:
+    """
+    Loads local data on first use, retrying after RETRY_AFTER seconds on failure
+    
+    The load function must only read local data (never download) since it runs
+    on the request path. It is called without a lock: loading twice from
+    concurrent threads is harmless.
+    """
+    
+    __slots__ = ('_load', '_logger', '_message', '_value', '_failed_at')
+    
+    def __init__(self, load: Callable, logger: logging.Logger, message: str):
+        self._load = load
+        self._logger = logger
+        self._message = message
+        self._value = None
+        self._failed_at = None
+    
+    def __call__(self):
+        """The loaded value, or None while the data is unavailable"""
+        if self._value is not None:
+            return self._value
+        if self._failed_at is not None and time.monotonic() - self._failed_at < RETRY_AFTER:
+            return None
+        
+        try:
+            self._value = self._load()
+        except LookupError:
+            self._failed_at = time.monotonic()
+            self._logger.warning('%s (retrying in %d seconds)', self._message, RETRY_AFTER)
+        
+        return self._value
+    
+    @property
+    def loaded(self) -> bool:
+        """Whether the data has been loaded successfully"""
+        return self._value is not None
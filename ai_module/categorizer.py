@@ -1,130 +1,205 @@
 """
 AI Module for complaint categorization using NLP
-Uses keyword-based classification with NLTK
+Uses a trained TF-IDF + logistic regression model when one is available,
+falling back to keyword-based classification with NLTK
 """
+import logging
+import os
 import re
+from types import MappingProxyType
 from typing import Dict, List, Tuple
-import nltk
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
+import Stemmer
+from config import Config
+from ._cache import RetryingLoader, TextResultCache
 
-# Download required NLTK data (run once)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+logger = logging.getLogger(__name__)
+
+
+def _read_stopwords() -> frozenset:
+    """
+    English stopwords from the local NLTK data
+    
+    Negations and intensifiers are kept since they carry meaning in complaints.
+    """
+    return frozenset(stopwords.words('english')) - {'no', 'not', 'very', 'cannot'}
+
+
+# Loaded on first use; nothing is downloaded here (see ai_module.download_nltk_data)
+_load_stopwords = RetryingLoader(
+    _read_stopwords, logger, 'NLTK stopwords unavailable; tokenizing without stopword removal'
+)
+
+
+# Alphanumeric runs in lowercased text; punctuation acts as a separator
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Serialized scikit-learn pipeline produced by train_categorizer_model()
+MODEL_PATH = os.path.join(Config.AI_MODEL_PATH, 'categorizer.joblib')
 
 
 class ComplaintCategorizer:
     """
     NLP-based complaint categorizer
-    Uses keyword matching and text analysis to classify complaints
+    Uses a trained text classifier, or keyword matching as a cold-start
+    fallback when no model file has been built yet
     """
     
-    def __init__(self):
-        self.stemmer = PorterStemmer()
-        try:
-            self.stop_words = set(stopwords.words('english'))
-        except:
-            self.stop_words = set()
+    __slots__ = (
+        'stemmer', 'category_keywords', 'stemmed_category_keywords',
+        '_category_list', '_vocab', '_kw_mat', '_kw_dense', 'pipeline'
+    )
+    
+    def __init__(self, model_path: str = MODEL_PATH):
+        # Snowball stemmer implemented in C; stemWords stems a whole list per call
+        self.stemmer = Stemmer.Stemmer('english')
         
-        # Category keywords mapping
-        self.category_keywords = {
-            'IT Issues': [
+        # Category keywords mapping (read-only proxies over tuples/frozensets, so
+        # nothing mutates these pages once they are shared between preforked workers)
+        self.category_keywords = MappingProxyType({
+            'IT Issues': (
                 'internet', 'wifi', 'network', 'computer', 'laptop', 'lab',
                 'software', 'hardware', 'printer', 'projector', 'system',
                 'server', 'website', 'portal', 'login', 'password', 'slow',
                 'connection', 'download', 'upload', 'screen', 'mouse', 'keyboard'
-            ],
-            'Hostel Management': [
+            ),
+            'Hostel Management': (
                 'hostel', 'room', 'accommodation', 'mess', 'food', 'canteen',
                 'warden', 'cleanliness', 'maintenance', 'water', 'electricity',
                 'bed', 'mattress', 'bathroom', 'toilet', 'hot water', 'cold water',
                 'roommate', 'noise', 'hygiene', 'laundry', 'dining'
-            ],
-            'Academics': [
+            ),
+            'Academics': (
                 'exam', 'test', 'marks', 'grades', 'faculty', 'professor',
                 'teacher', 'course', 'class', 'lecture', 'syllabus', 'schedule',
                 'timetable', 'attendance', 'assignment', 'project', 'lab report',
                 'curriculum', 'subject', 'semester', 'academic', 'study'
-            ],
-            'Administration': [
+            ),
+            'Administration': (
                 'certificate', 'document', 'bonafide', 'admission', 'registration',
                 'fee', 'payment', 'scholarship', 'id card', 'transcript',
                 'verification', 'office', 'application', 'form', 'approval',
                 'process', 'department', 'staff', 'administration', 'official'
-            ],
-            'Library': [
+            ),
+            'Library': (
                 'library', 'book', 'reference', 'journal', 'reading room',
                 'librarian', 'borrow', 'return', 'due date', 'fine', 'catalog',
                 'search', 'database', 'e-book', 'digital', 'photocopy',
                 'study space', 'quiet', 'hours', 'membership'
-            ],
-            'Sports & Recreation': [
+            ),
+            'Sports & Recreation': (
                 'sports', 'playground', 'field', 'court', 'gym', 'fitness',
                 'basketball', 'football', 'cricket', 'volleyball', 'equipment',
                 'recreation', 'athletic', 'tournament', 'game', 'physical',
                 'exercise', 'coach', 'training', 'facility'
-            ],
-            'Other': []
-        }
+            ),
+            'Other': ()
+        })
+        
+        # Stem category keywords once up front so scoring is a set lookup
+        self.stemmed_category_keywords = MappingProxyType({
+            category: frozenset(self.stemmer.stemWords([kw.lower() for kw in keywords]))
+            for category, keywords in self.category_keywords.items()
+        })
+        
+        # Same keywords as a (categories x vocabulary) 0/1 matrix for batch scoring
+        self._category_list = tuple(self.stemmed_category_keywords.keys())
+        all_stems = set().union(*self.stemmed_category_keywords.values())
+        self._vocab = MappingProxyType({stem: i for i, stem in enumerate(sorted(all_stems))})
+        rows, cols = [], []
+        for row, category in enumerate(self._category_list):
+            for stem in self.stemmed_category_keywords[category]:
+                rows.append(row)
+                cols.append(self._vocab[stem])
+        self._kw_mat = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(self._category_list), len(self._vocab))
+        )
+        # Dense copy for single texts: a few KB, and far cheaper than building
+        # a sparse vector per call
+        self._kw_dense = self._kw_mat.toarray()
+        for array in (self._kw_mat.data, self._kw_mat.indices, self._kw_mat.indptr, self._kw_dense):
+            array.setflags(write=False)
+        
+        # Trained classifier (None until a model has been built offline)
+        self.pipeline = self.load_pipeline(model_path)
+    
+    @property
+    def stop_words(self) -> frozenset:
+        """English stopwords (NLTK data is loaded on first use, not at import)"""
+        return _load_stopwords() or frozenset()
+    
+    @staticmethod
+    def load_pipeline(model_path: str):
+        """
+        Load the serialized TF-IDF + classifier pipeline
+        
+        Returns:
+            The fitted pipeline, or None if the model file is missing or unreadable
+        """
+        if not os.path.exists(model_path):
+            return None
+        
+        try:
+            return joblib.load(model_path)
+        except Exception:
+            logger.warning(
+                'Could not load categorizer model from %s; using keyword matching',
+                model_path, exc_info=True
+            )
+            return None
+    
+    def predict_probabilities(self, complaint_text: str) -> List[Tuple[str, float]]:
+        """
+        Score a complaint with the trained pipeline
+        
+        Returns:
+            List of (category, probability) sorted by probability, highest first
+        """
+        probs = self.pipeline.predict_proba([complaint_text])[0]
+        classes = self.pipeline.classes_
+        order = probs.argsort()[::-1]
+        
+        return [(str(classes[idx]), float(probs[idx])) for idx in order]
     
     def preprocess_text(self, text: str) -> List[str]:
         """
         Preprocess complaint text
         - Convert to lowercase
-        - Remove special characters
-        - Tokenize
+        - Tokenize on alphanumeric runs
         - Remove stopwords
         - Stem words
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters but keep spaces
-        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-        
-        # Tokenize
-        try:
-            tokens = word_tokenize(text)
-        except:
-            # Fallback to simple split if NLTK tokenizer fails
-            tokens = text.split()
+        return self.stemmer.stemWords(self.tokenize(text))
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Lowercase, tokenize and drop stopwords (without stemming)
+        """
+        tokens = _TOKEN_RE.findall(text.lower())
         
-        # Remove stopwords and stem
-        processed_tokens = []
-        for token in tokens:
-            if token not in self.stop_words and len(token) > 2:
-                stemmed = self.stemmer.stem(token)
-                processed_tokens.append(stemmed)
+        stop_words = self.stop_words
         
-        return processed_tokens
+        # Cheap length check first so short tokens skip the set lookup
+        return [token for token in tokens if len(token) > 2 and token not in stop_words]
     
-    def calculate_category_scores(self, tokens: List[str]) -> Dict[str, float]:
+    def calculate_category_scores(self, tokens: List[str]) -> np.ndarray:
         """
         Calculate matching scores for each category
-        """
-        scores = {}
         
-        for category, keywords in self.category_keywords.items():
-            score = 0
-            # Stem category keywords
-            stemmed_keywords = [self.stemmer.stem(kw.lower()) for kw in keywords]
-            
-            # Count matches
-            for token in tokens:
-                if token in stemmed_keywords:
-                    score += 1
-            
-            scores[category] = score
+        Returns:
+            Array of keyword match counts, aligned with the category_keywords order
+        """
+        # Count only tokens that are keyword stems
+        vocab = self._vocab
+        counts = np.bincount([vocab[token] for token in tokens if token in vocab], minlength=len(vocab))
         
-        return scores
+        # One product gives the match count for every category
+        return self._kw_dense @ counts
     
     def categorize(self, complaint_text: str, manual_category: str = None) -> Tuple[str, float]:
         """
@@ -141,6 +216,11 @@ class ComplaintCategorizer:
         if manual_category and manual_category in self.category_keywords:
             return manual_category, 0.95
         
+        # Use the trained model when available
+        if self.pipeline is not None:
+            category, probability = self.predict_probabilities(complaint_text)[0]
+            return category, min(probability, 0.99)
+        
         # Preprocess text
         tokens = self.preprocess_text(complaint_text)
         
@@ -148,49 +228,145 @@ class ComplaintCategorizer:
         scores = self.calculate_category_scores(tokens)
         
         # Find best match
-        max_score = max(scores.values())
+        idx = scores.argmax()
+        max_score = scores[idx]
         
         if max_score == 0:
             # No keywords matched, classify as 'Other'
             return 'Other', 0.5
         
-        # Get category with highest score
-        best_category = max(scores, key=scores.get)
-        
         # Calculate confidence (normalized score)
-        total_keywords = sum(scores.values())
-        confidence = max_score / total_keywords if total_keywords > 0 else 0.5
-        confidence = min(confidence, 0.99)  # Cap at 0.99
+        total_keywords = scores.sum()
+        confidence = min(float(max_score / total_keywords), 0.99)  # Cap at 0.99
         
-        return best_category, confidence
+        return self._category_list[idx], confidence
     
     def get_category_suggestions(self, complaint_text: str, top_n: int = 3) -> List[Tuple[str, float]]:
         """
         Get top N category suggestions with confidence scores
         """
+        if self.pipeline is not None:
+            return self.predict_probabilities(complaint_text)[:top_n]
+        
         tokens = self.preprocess_text(complaint_text)
         scores = self.calculate_category_scores(tokens)
         
-        # Sort by score
-        sorted_categories = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        # Sort by score (stable, so ties keep category order)
+        top = np.argsort(-scores, kind='stable')[:top_n]
         
         # Calculate confidence for top N
-        suggestions = []
-        total_score = sum(scores.values())
+        total_score = scores.sum()
+        confidences = scores[top] / total_score if total_score > 0 else np.zeros(len(top))
+        
+        return [
+            (self._category_list[idx], float(confidence))
+            for idx, confidence in zip(top, confidences)
+        ]
+    
+    def categorize_batch(self, complaint_texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Categorize many complaints at once
+        
+        Tokens from every complaint are stemmed in a single call and scored
+        with one sparse matrix product instead of a Python loop per complaint.
+        
+        Returns:
+            List of (predicted_category, confidence_score), one per complaint
+        """
+        if not complaint_texts:
+            return []
+        
+        if self.pipeline is not None:
+            probs = self.pipeline.predict_proba(complaint_texts)
+            classes = self.pipeline.classes_
+            best = probs.argmax(axis=1)
+            return [
+                (str(classes[idx]), min(float(row[idx]), 0.99))
+                for idx, row in zip(best, probs)
+            ]
+        
+        # Tokenize every document, then stem all tokens in one call
+        token_lists = [self.tokenize(text) for text in complaint_texts]
+        offsets = np.cumsum([0] + [len(tokens) for tokens in token_lists])
+        stems = self.stemmer.stemWords([token for tokens in token_lists for token in tokens])
         
-        for category, score in sorted_categories[:top_n]:
-            if total_score > 0:
-                confidence = score / total_score
+        # Document x vocabulary count matrix, keeping only keyword stems
+        rows, cols = [], []
+        for doc in range(len(token_lists)):
+            for stem in stems[offsets[doc]:offsets[doc + 1]]:
+                col = self._vocab.get(stem)
+                if col is not None:
+                    rows.append(doc)
+                    cols.append(col)
+        doc_term = csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(len(token_lists), len(self._vocab))
+        )
+        
+        # (documents x categories) keyword match counts
+        scores = (doc_term @ self._kw_mat.T).toarray()
+        best = scores.argmax(axis=1)
+        max_scores = scores.max(axis=1)
+        totals = scores.sum(axis=1)
+        
+        results = []
+        for idx, max_score, total in zip(best, max_scores, totals):
+            if max_score == 0:
+                results.append(('Other', 0.5))
             else:
-                confidence = 0.0
-            suggestions.append((category, confidence))
+                results.append((self._category_list[idx], min(float(max_score / total), 0.99)))
         
-        return suggestions
+        return results
+
+
+def train_categorizer_model(
+    descriptions: List[str],
+    categories: List[str],
+    model_path: str = MODEL_PATH
+):
+    """
+    Fit a TF-IDF + logistic regression pipeline on historical complaints
+    and save it where ComplaintCategorizer looks for it
+    
+    Args:
+        descriptions: Complaint descriptions (e.g. Complaint.description)
+        categories: Resolved category for each description (e.g. Complaint.category)
+        model_path: Destination of the serialized pipeline
+    
+    Returns:
+        The fitted pipeline
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    
+    pipeline = Pipeline([
+        ('tfidf', TfidfVectorizer(lowercase=True, ngram_range=(1, 2), sublinear_tf=True)),
+        ('clf', LogisticRegression(max_iter=1000))
+    ])
+    pipeline.fit(descriptions, categories)
+    
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump(pipeline, model_path)
+    
+    return pipeline
 
 
 # Global categorizer instance
 categorizer = ComplaintCategorizer()
 
+# Results for previously seen texts
+_result_cache = TextResultCache(maxsize=8192)
+
+
+def _categorize_uncached(complaint_text: str) -> Dict:
+    """Categorize a complaint without consulting the result cache"""
+    category, confidence = categorizer.categorize(complaint_text)
+    return {
+        'category': category,
+        'confidence': confidence
+    }
+
 
 def categorize_complaint(complaint_text: str, manual_category: str = None) -> Dict:
     """
@@ -199,9 +375,22 @@ def categorize_complaint(complaint_text: str, manual_category: str = None) -> Di
     Returns:
         Dictionary with category and confidence
     """
-    category, confidence = categorizer.categorize(complaint_text, manual_category)
+    # Manual categories bypass the model, so there is nothing worth caching
+    if manual_category:
+        category, confidence = categorizer.categorize(complaint_text, manual_category)
+        return {'category': category, 'confidence': confidence}
     
-    return {
-        'category': category,
-        'confidence': confidence
-    }
+    return _result_cache.get(complaint_text, _categorize_uncached)
+
+
+def categorize_batch(complaint_texts: List[str]) -> List[Dict]:
+    """
+    Convenience function to categorize a list of complaints
+    
+    Returns:
+        List of dictionaries with category and confidence
+    """
+    return [
+        {'category': category, 'confidence': confidence}
+        for category, confidence in categorizer.categorize_batch(complaint_texts)
+    ]
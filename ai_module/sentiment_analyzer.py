@@ -1,10 +1,27 @@
 """
 Sentiment Analyzer for detecting complaint urgency
-Uses TextBlob for sentiment analysis
+Uses NLTK's VADER lexicon scorer for sentiment analysis
 """
-from textblob import TextBlob
-from typing import Dict, Tuple
-import re
+import logging
+import ahocorasick
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from typing import Dict, List, Tuple
+import numpy as np
+from ._cache import RetryingLoader, TextResultCache
+
+
+logger = logging.getLogger(__name__)
+
+# VADER analyzer, loaded on first use; nothing is downloaded here
+# (see ai_module.download_nltk_data)
+_load_vader = RetryingLoader(
+    SentimentIntensityAnalyzer, logger, 'VADER lexicon unavailable; sentiment scores fall back to neutral'
+)
+
+
+def _is_word_char(char: str) -> bool:
+    """Characters regex treats as part of a word"""
+    return char.isalnum() or char == '_'
 
 
 class SentimentAnalyzer:
@@ -13,20 +30,28 @@ class SentimentAnalyzer:
     Negative sentiment = Higher urgency
     """
     
+    __slots__ = ('urgent_keywords', 'problem_keywords', '_urgent_automaton')
+    
     def __init__(self):
         # Keywords that indicate high urgency
-        self.urgent_keywords = [
+        self.urgent_keywords = (
             'urgent', 'immediately', 'asap', 'emergency', 'critical',
             'serious', 'severe', 'dangerous', 'broken', 'not working',
             'failed', 'unable', 'cannot', 'stuck', 'blocked', 'help',
             'please', 'very', 'extremely', 'terrible', 'worst', 'awful'
-        ]
+        )
         
         # Keywords that indicate issues/problems
-        self.problem_keywords = [
+        self.problem_keywords = (
             'issue', 'problem', 'trouble', 'difficulty', 'concern',
             'complaint', 'error', 'fault', 'defect', 'malfunction'
-        ]
+        )
+        
+        # Aho-Corasick automaton finds every urgent keyword in one linear pass
+        self._urgent_automaton = ahocorasick.Automaton()
+        for keyword in self.urgent_keywords:
+            self._urgent_automaton.add_word(keyword, len(keyword))
+        self._urgent_automaton.make_automaton()
     
     def analyze_sentiment(self, text: str) -> Tuple[float, float]:
         """
@@ -36,12 +61,20 @@ class SentimentAnalyzer:
             Tuple of (polarity, subjectivity)
             - polarity: -1 (negative) to 1 (positive)
             - subjectivity: 0 (objective) to 1 (subjective)
+        
+        VADER's compound score is the polarity, and its magnitude stands in
+        for subjectivity (strongly worded text is treated as more subjective).
         """
+        vader = _load_vader()
+        if vader is None:
+            # Lexicon unavailable
+            return 0.0, 0.5
+        
         try:
-            blob = TextBlob(text)
-            return blob.sentiment.polarity, blob.sentiment.subjectivity
+            compound = vader.polarity_scores(text)['compound']
+            return compound, abs(compound)
         except:
-            # Fallback if TextBlob fails
+            # Fallback if VADER fails
             return 0.0, 0.5
     
     def detect_urgent_keywords(self, text: str) -> int:
@@ -49,28 +82,45 @@ class SentimentAnalyzer:
         Count urgent keywords in text
         """
         text_lower = text.lower()
+        last = len(text_lower) - 1
         count = 0
         
-        for keyword in self.urgent_keywords:
-            # Use word boundaries to match whole words
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            matches = re.findall(pattern, text_lower)
-            count += len(matches)
+        for end, length in self._urgent_automaton.iter(text_lower):
+            start = end - length + 1
+            # Only count whole words (same boundaries as regex \b)
+            if start > 0 and _is_word_char(text_lower[start - 1]):
+                continue
+            if end < last and _is_word_char(text_lower[end + 1]):
+                continue
+            count += 1
         
         return count
     
-    def calculate_urgency_score(self, text: str) -> float:
+    def calculate_urgency_score(
+        self,
+        text: str,
+        polarity: float = None,
+        subjectivity: float = None,
+        urgent_count: int = None
+    ) -> float:
         """
         Calculate urgency score based on sentiment and keywords
         
+        Args:
+            text: Complaint text
+            polarity, subjectivity: Precomputed sentiment (optional)
+            urgent_count: Precomputed urgent keyword count (optional)
+        
         Returns:
             Score between 0 and 1 (higher = more urgent)
         """
         # Get sentiment
-        polarity, subjectivity = self.analyze_sentiment(text)
+        if polarity is None or subjectivity is None:
+            polarity, subjectivity = self.analyze_sentiment(text)
         
         # Count urgent keywords
-        urgent_count = self.detect_urgent_keywords(text)
+        if urgent_count is None:
+            urgent_count = self.detect_urgent_keywords(text)
         
         # Calculate base urgency from negative sentiment
         # More negative = more urgent
@@ -87,13 +137,19 @@ class SentimentAnalyzer:
         
         return urgency_score
     
-    def determine_priority(self, text: str, manual_priority: str = None) -> str:
+    def determine_priority(
+        self,
+        text: str,
+        manual_priority: str = None,
+        urgency: float = None
+    ) -> str:
         """
         Determine priority level based on sentiment analysis
         
         Args:
             text: Complaint text
             manual_priority: User-selected priority (optional)
+            urgency: Precomputed urgency score (optional)
         
         Returns:
             Priority level: 'High', 'Medium', or 'Low'
@@ -103,7 +159,8 @@ class SentimentAnalyzer:
             return manual_priority
         
         # Calculate urgency score
-        urgency = self.calculate_urgency_score(text)
+        if urgency is None:
+            urgency = self.calculate_urgency_score(text)
         
         # Map urgency to priority
         if urgency >= 0.6:
@@ -120,10 +177,11 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment metrics and priority
         """
+        # Analyze sentiment and scan keywords once, then reuse the results
         polarity, subjectivity = self.analyze_sentiment(text)
-        urgency = self.calculate_urgency_score(text)
-        priority = self.determine_priority(text, manual_priority)
         urgent_keywords = self.detect_urgent_keywords(text)
+        urgency = self.calculate_urgency_score(text, polarity, subjectivity, urgent_keywords)
+        priority = self.determine_priority(text, manual_priority, urgency)
         
         return {
             'polarity': polarity,
@@ -133,14 +191,69 @@ class SentimentAnalyzer:
             'urgent_keyword_count': urgent_keywords,
             'sentiment': 'negative' if polarity < -0.1 else 'positive' if polarity > 0.1 else 'neutral'
         }
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Sentiment analysis for many complaints at once
+        
+        Urgency and priority are computed as array operations over the whole
+        batch; results match analyze_complaint for each text.
+        """
+        if not texts:
+            return []
+        
+        sentiments = [self.analyze_sentiment(text) for text in texts]
+        polarity = np.array([p for p, _ in sentiments], dtype=float)
+        subjectivity = np.array([s for _, s in sentiments], dtype=float)
+        urgent_counts = np.array([self.detect_urgent_keywords(text) for text in texts])
+        
+        # Same formula as calculate_urgency_score, vectorized
+        urgency = np.minimum(
+            np.maximum(0, -polarity)
+            + np.minimum(urgent_counts * 0.15, 0.5)
+            + subjectivity * 0.2,
+            1.0
+        )
+        priority = np.where(urgency >= 0.6, 'High', np.where(urgency >= 0.3, 'Medium', 'Low'))
+        sentiment = np.where(
+            polarity < -0.1, 'negative', np.where(polarity > 0.1, 'positive', 'neutral')
+        )
+        
+        return [
+            {
+                'polarity': pol,
+                'subjectivity': subj,
+                'urgency_score': float(urg),
+                'priority': str(prio),
+                'urgent_keyword_count': int(count),
+                'sentiment': str(sent)
+            }
+            for (pol, subj), urg, prio, count, sent
+            in zip(sentiments, urgency, priority, urgent_counts, sentiment)
+        ]
 
 
 # Global analyzer instance
 analyzer = SentimentAnalyzer()
 
+# Results for previously seen texts
+_result_cache = TextResultCache(maxsize=8192)
+
 
 def analyze_complaint_sentiment(text: str, manual_priority: str = None) -> Dict:
     """
     Convenience function to analyze complaint sentiment
     """
-    return analyzer.analyze_complaint(text, manual_priority)
+    # Manual priorities change the result, so only cache automatic analysis
+    if manual_priority:
+        return analyzer.analyze_complaint(text, manual_priority)
+    
+    # Don't keep neutral fallback results computed without the lexicon
+    return _result_cache.get(text, analyzer.analyze_complaint, lambda: _load_vader.loaded)
+
+
+def analyze_batch(texts: List[str]) -> List[Dict]:
+    """
+    Convenience function to analyze sentiment of a list of complaints
+    """
+    return analyzer.analyze_batch(texts)
@@ -0,0 +1,12 @@
+-- Add materialized resolution time to existing databases
+-- Run once against databases created before resolution_time was added to schema.sql
+USE campus_assistant;
+
+ALTER TABLE complaints
+    ADD COLUMN resolution_time INT AFTER resolved_at, -- in hours
+    ADD INDEX idx_category_status (category, status);
+
+-- Backfill already resolved complaints (minimum of 1 hour, as the application does)
+UPDATE complaints
+SET resolution_time = GREATEST(TIMESTAMPDIFF(HOUR, submitted_at, resolved_at), 1)
+WHERE resolved_at IS NOT NULL AND submitted_at IS NOT NULL;
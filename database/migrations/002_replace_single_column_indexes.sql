@@ -0,0 +1,19 @@
+-- Replace single-column indexes with the composite indexes that cover them
+-- Run once against databases created before the composite indexes were added to schema.sql
+-- (after 001_add_resolution_time.sql, which creates idx_category_status)
+USE campus_assistant;
+
+-- Composites are created first: InnoDB needs an index on the foreign key
+-- columns before idx_student / idx_user can be dropped
+ALTER TABLE complaints
+    ADD INDEX idx_student_submitted (student_id, submitted_at DESC),
+    ADD INDEX idx_student_status (student_id, status),
+    ADD INDEX idx_status_submitted (status, submitted_at DESC);
+
+ALTER TABLE complaints
+    DROP INDEX idx_status,
+    DROP INDEX idx_category,
+    DROP INDEX idx_student;
+
+ALTER TABLE notifications ADD INDEX idx_user_read (user_id, is_read);
+ALTER TABLE notifications DROP INDEX idx_user;
@@ -0,0 +1,6 @@
+-- Widen password hashes for argon2 encoded hashes
+-- Run once against databases created before password_hash was widened in schema.sql
+USE campus_assistant;
+
+ALTER TABLE users MODIFY password_hash VARCHAR(512) NOT NULL;
+ALTER TABLE admins MODIFY password_hash VARCHAR(512) NOT NULL;
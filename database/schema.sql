@@ -10,7 +10,7 @@ CREATE TABLE IF NOT EXISTS users (
     student_id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(512) NOT NULL,
     phone VARCHAR(20),
     department VARCHAR(100),
     roll_number VARCHAR(50) UNIQUE,
@@ -24,7 +24,7 @@ CREATE TABLE IF NOT EXISTS admins (
     admin_id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL,
+    password_hash VARCHAR(512) NOT NULL,
     role VARCHAR(50) DEFAULT 'admin',
     department VARCHAR(100),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -53,13 +53,15 @@ CREATE TABLE IF NOT EXISTS complaints (
     predicted_resolution_time INT, -- in hours
     submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     resolved_at TIMESTAMP NULL,
+    resolution_time INT, -- in hours
     assigned_to VARCHAR(100),
     resolution_notes TEXT,
     FOREIGN KEY (student_id) REFERENCES users(student_id) ON DELETE CASCADE,
-    INDEX idx_status (status),
-    INDEX idx_category (category),
-    INDEX idx_student (student_id),
-    INDEX idx_submitted_at (submitted_at)
+    INDEX idx_submitted_at (submitted_at),
+    INDEX idx_category_status (category, status),
+    INDEX idx_student_submitted (student_id, submitted_at DESC),
+    INDEX idx_student_status (student_id, status),
+    INDEX idx_status_submitted (status, submitted_at DESC)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
 -- Complaint history/tracking table
@@ -99,6 +101,6 @@ CREATE TABLE IF NOT EXISTS notifications (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (ticket_id) REFERENCES complaints(ticket_id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(student_id) ON DELETE CASCADE,
-    INDEX idx_user (user_id),
-    INDEX idx_read (is_read)
+    INDEX idx_read (is_read),
+    INDEX idx_user_read (user_id, is_read)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,16 @@
+"""
+Gunicorn configuration for AI Smart Campus Assistant
+
+Usage: gunicorn -c gunicorn.conf.py -w 4 wsgi:app
+"""
+import gc
+import os
+
+# Load the app (and warm up the AI models) once in the master process
+preload_app = True
+os.environ.setdefault('AI_PRELOAD', '1')
+
+
+def pre_fork(server, worker):
+    """Move everything loaded so far out of GC tracking so workers keep sharing its pages"""
+    gc.freeze()
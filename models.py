@@ -4,11 +4,72 @@ Uses SQLAlchemy ORM for database interactions
 """
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload, selectinload, validates
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+import hashlib
+import os
+import threading
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
+from werkzeug.security import check_password_hash
 
 db = SQLAlchemy()
 
+# Argon2id tuned to roughly 50ms per hash
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+# Recent password checks so repeated re-authentication skips the KDF.
+# Keys include the stored hash (a password change invalidates them) and a
+# BLAKE2b digest keyed with a per-process secret, never the password itself.
+_password_check_cache = TTLCache(maxsize=1024, ttl=30)
+_password_check_lock = threading.Lock()
+_password_digest_key = os.urandom(32)
+
+
+def hash_password(password):
+    """Hash a password with argon2"""
+    return _password_hasher.hash(password)
+
+
+def password_needs_rehash(password_hash):
+    """Whether a stored hash predates argon2 or uses outdated parameters"""
+    if not password_hash.startswith('$argon2'):
+        return True
+    try:
+        return _password_hasher.check_needs_rehash(password_hash)
+    except InvalidHashError:
+        return True
+
+
+def verify_password(account_id, password_hash, password):
+    """
+    Verify a password against a stored hash, caching the result briefly
+    
+    Hashes created before the switch to argon2 are checked with werkzeug.
+    """
+    digest = hashlib.blake2b(password.encode(), key=_password_digest_key).digest()
+    key = (account_id, password_hash, digest)
+    
+    with _password_check_lock:
+        cached = _password_check_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    if password_hash.startswith('$argon2'):
+        try:
+            valid = _password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            valid = False
+    else:
+        valid = check_password_hash(password_hash, password)
+    
+    with _password_check_lock:
+        _password_check_cache[key] = valid
+    
+    return valid
+
 
 class User(UserMixin, db.Model):
     """Student/User model"""
@@ -17,7 +78,7 @@ class User(UserMixin, db.Model):
     student_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False, index=True)
-    password_hash = db.Column(db.String(255), nullable=False)
+    password_hash = db.Column(db.String(512), nullable=False)
     phone = db.Column(db.String(20))
     department = db.Column(db.String(100))
     roll_number = db.Column(db.String(50), unique=True, index=True)
@@ -25,6 +86,9 @@ class User(UserMixin, db.Model):
     
     # Relationships
     complaints = db.relationship('Complaint', backref='student', lazy='dynamic', cascade='all, delete-orphan')
+    # Read-only list of the same complaints that list views can eager-load
+    # (see query_with_complaints); dynamic relationships can't be
+    complaint_list = db.relationship('Complaint', lazy='select', viewonly=True)
     qr_codes = db.relationship('QRCode', backref='student', lazy='dynamic', cascade='all, delete-orphan')
     notifications = db.relationship('Notification', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     
@@ -34,14 +98,22 @@ class User(UserMixin, db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        """Verify password, upgrading outdated hashes (saved with the session's next commit)"""
+        valid = verify_password(self.get_id(), self.password_hash, password)
+        if valid and password_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return valid
     
     def __repr__(self):
         return f'<User {self.name}>'
+    
+    @classmethod
+    def query_with_complaints(cls):
+        """User query that loads complaint_list in one extra SELECT (for list views)"""
+        return cls.query.options(selectinload(cls.complaint_list))
 
 
 class Admin(UserMixin, db.Model):
@@ -51,7 +123,7 @@ class Admin(UserMixin, db.Model):
     admin_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False, index=True)
-    password_hash = db.Column(db.String(255), nullable=False)
+    password_hash = db.Column(db.String(512), nullable=False)
     role = db.Column(db.String(50), default='admin')
     department = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -62,11 +134,14 @@ class Admin(UserMixin, db.Model):
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        """Verify password, upgrading outdated hashes (saved with the session's next commit)"""
+        valid = verify_password(self.get_id(), self.password_hash, password)
+        if valid and password_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return valid
     
     def __repr__(self):
         return f'<Admin {self.name}>'
@@ -91,32 +166,81 @@ class Complaint(db.Model):
     __tablename__ = 'complaints'
     
     ticket_id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('users.student_id'), nullable=False, index=True)
-    category = db.Column(db.String(100), nullable=False, index=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('users.student_id'), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
     priority = db.Column(db.String(20), default='Medium')
-    status = db.Column(db.String(50), default='Pending', index=True)
+    status = db.Column(db.String(50), default='Pending')
     ai_category = db.Column(db.String(100))
     sentiment_score = db.Column(db.Float)
     predicted_resolution_time = db.Column(db.Integer)  # in hours
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     resolved_at = db.Column(db.DateTime)
+    resolution_time = db.Column(db.Integer)  # in hours, computed on flush from resolved_at
     assigned_to = db.Column(db.String(100))
     resolution_notes = db.Column(db.Text)
     
+    # student_id, category and status are covered by the leading columns of
+    # these composites, so they have no single-column indexes of their own
+    __table_args__ = (
+        db.Index('ix_complaint_category_status', 'category', 'status'),
+        db.Index('ix_complaint_student_submitted', student_id, submitted_at.desc()),
+        db.Index('ix_complaint_student_status', 'student_id', 'status'),
+        db.Index('ix_complaint_status_submitted', status, submitted_at.desc()),
+        {'mysql_engine': 'InnoDB'}
+    )
+    __mapper_args__ = {'eager_defaults': True}
+    
     # Relationships
     history = db.relationship('ComplaintHistory', backref='complaint', lazy='dynamic', cascade='all, delete-orphan')
     notifications = db.relationship('Notification', backref='complaint', lazy='dynamic', cascade='all, delete-orphan')
     
+    # Serialized form built by to_dict (cleared whenever the row changes)
+    _cached_dict = None
+    
     def __repr__(self):
         return f'<Complaint {self.ticket_id}>'
     
+    @classmethod
+    def query_with_student(cls):
+        """Complaint query that loads the student in the same SELECT (for list views)"""
+        return cls.query.options(joinedload(cls.student))
+    
+    @validates(
+        'student_id', 'category', 'description', 'priority', 'status', 'resolved_at',
+        'ai_category', 'sentiment_score', 'predicted_resolution_time', 'submitted_at',
+        'resolution_time', 'assigned_to', 'resolution_notes'
+    )
+    def invalidate_cached_dict(self, key, value):
+        """Drop the cached to_dict result when a serialized attribute changes"""
+        self._cached_dict = None
+        return value
+    
     def to_dict(self):
-        """Convert complaint to dictionary"""
+        """Convert complaint to dictionary (row columns cached once persisted)"""
+        data = self._cached_dict
+        if data is None:
+            data = self._build_dict()
+            # Pending rows still lack their ticket_id and defaults, so only cache persisted ones
+            if inspect(self).persistent:
+                self._cached_dict = data
+        
+        data = dict(data)
+        # Read live: the student's name can change without touching this row
+        data['student_name'] = self.student.name if self.student else 'Unknown'
+        return data
+    
+    @classmethod
+    def bulk_to_dicts(cls, complaints):
+        """Convert many complaints to dictionaries (reuses each row's cached dict)"""
+        return [complaint.to_dict() for complaint in complaints]
+    
+    def _build_dict(self):
+        """Read the serialized columns from the row (student_name is filled in by to_dict)"""
         return {
             'ticket_id': self.ticket_id,
             'student_id': self.student_id,
-            'student_name': self.student.name if self.student else 'Unknown',
+            'student_name': None,
             'category': self.category,
             'description': self.description,
             'priority': self.priority,
@@ -126,11 +250,53 @@ class Complaint(db.Model):
             'predicted_resolution_time': self.predicted_resolution_time,
             'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
             'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None,
+            'resolution_time': self.resolution_time,
             'assigned_to': self.assigned_to,
             'resolution_notes': self.resolution_notes
         }
 
 
+def _update_resolution_time(target):
+    """Materialize resolution_time so statistics can be aggregated in SQL"""
+    if target.resolved_at and target.submitted_at:
+        hours = int((target.resolved_at - target.submitted_at).total_seconds() // 3600)
+        resolution_time = max(hours, 1)
+    else:
+        resolution_time = None
+    
+    if target.resolution_time != resolution_time:
+        target.resolution_time = resolution_time
+
+
+@event.listens_for(Complaint, 'before_insert')
+def _complaint_before_insert(mapper, connection, target):
+    if target.submitted_at is None:
+        # Apply the column default now so it can be used below
+        target.submitted_at = datetime.utcnow()
+    
+    _update_resolution_time(target)
+
+
+@event.listens_for(Complaint, 'before_update')
+def _complaint_before_update(mapper, connection, target):
+    # Existing rows without a submission time keep it NULL (and get no resolution time)
+    _update_resolution_time(target)
+
+
+@event.listens_for(Complaint, 'expire')
+def _complaint_expired(target, attrs):
+    """Reloaded attributes may differ from the cached serialization"""
+    # The instance may already be garbage collected when its state is expired
+    if target is not None:
+        target._cached_dict = None
+
+
+@event.listens_for(Complaint, 'refresh')
+def _complaint_refreshed(target, context, attrs):
+    if target is not None:
+        target._cached_dict = None
+
+
 class ComplaintHistory(db.Model):
     """Complaint history/tracking model"""
     __tablename__ = 'complaint_history'
@@ -164,10 +330,13 @@ class QRCode(db.Model):
 class Notification(db.Model):
     """Notification model"""
     __tablename__ = 'notifications'
+    __table_args__ = (
+        db.Index('ix_notification_user_read', 'user_id', 'is_read'),
+    )
     
     notification_id = db.Column(db.Integer, primary_key=True)
     ticket_id = db.Column(db.Integer, db.ForeignKey('complaints.ticket_id'), index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.student_id'), index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.student_id'))  # indexed by ix_notification_user_read
     message = db.Column(db.Text, nullable=False)
     notification_type = db.Column(db.String(50))
     is_read = db.Column(db.Boolean, default=False, index=True)